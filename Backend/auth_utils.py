@@ -2,19 +2,33 @@
 JWT authentication helpers.
 """
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "readmeforge-super-secret-key-change-in-production")
+# PyJWT routes HS256 through the stdlib hmac/hashlib pair, i.e. OpenSSL's
+# SHA-256 (hardware SHA-NI where available) — there is nothing left to gain
+# from a hand-rolled or JIT-compiled verifier here.
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# Verified-token cache: token → (payload, expiry_epoch).
+# Clients reuse the same bearer token for up to 7 days, so re-running the
+# HMAC + base64 + JSON decode on every request is wasted CPU. Entries expire
+# with the token's own `exp` claim (capped at TOKEN_CACHE_TTL so revocation
+# via key rotation is picked up quickly). Failed decodes are never cached.
+TOKEN_CACHE_TTL = 60          # seconds
+TOKEN_CACHE_MAX = 10_000      # entries
+_token_cache: dict[str, tuple[dict, float]] = {}
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -24,10 +38,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> dict:
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        payload, expires_at = cached
+        if expires_at > now:
+            return payload
+        del _token_cache[token]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = payload.get("exp", now)
+        if len(_token_cache) >= TOKEN_CACHE_MAX:
+            _token_cache.clear()
+        _token_cache[token] = (payload, min(now + TOKEN_CACHE_TTL, exp))
         return payload
-    except JWTError:
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
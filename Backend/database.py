@@ -2,13 +2,16 @@
 Database layer — Firebase primary, SQLite fallback.
 """
 import os
-import json
-import uuid
+import time
+import asyncio
+import secrets
 import logging
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import Optional
 
 import aiosqlite
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +56,7 @@ CREATE TABLE IF NOT EXISTS users (
     name         TEXT NOT NULL,
     email        TEXT UNIQUE NOT NULL,
     password_hash TEXT NOT NULL,
-    created_at   TEXT NOT NULL
+    created_at   REAL NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS documents (
@@ -63,39 +66,200 @@ CREATE TABLE IF NOT EXISTS documents (
     output_type         TEXT NOT NULL,
     cleaned_structure   TEXT,
     file_path           TEXT,
-    created_at          TEXT NOT NULL,
+    created_at          REAL NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(uid)
 );
+
+-- Dashboard listing: WHERE user_id = ? ORDER BY created_at DESC.
+-- The composite index serves both the filter and the sort, avoiding a
+-- full scan + in-memory sort per request.
+CREATE INDEX IF NOT EXISTS idx_documents_user_created
+    ON documents(user_id, created_at DESC);
+
+-- Login lookup (UNIQUE already implies an index; explicit for clarity)
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 """
 
 
+# Long-lived connections. Opening a fresh aiosqlite connection per call
+# spawns a new worker thread and starts with a cold page cache; reusing them
+# keeps every query against an already-warm cache. With WAL, SQLite allows
+# one writer plus N concurrent readers — so writes go through a single RW
+# connection while reads round-robin over a small pool of read-only ones.
+_writer: Optional[aiosqlite.Connection] = None
+_readers: Optional[asyncio.Queue] = None
+
+READER_POOL_SIZE = 4
+
+_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",       # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",     # fsync on checkpoint, not every commit
+    "PRAGMA temp_store=memory",
+    "PRAGMA cache_size=-64000",      # 64 MB page cache
+)
+
+_READER_PRAGMAS = (
+    "PRAGMA temp_store=memory",
+    "PRAGMA cache_size=-64000",
+)
+
+
 async def init_db():
-    """Create SQLite tables if they don't exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.executescript(SCHEMA)
-        await db.commit()
+    """Create SQLite tables if needed and open the shared connections."""
+    global _writer, _readers
+    _writer = await aiosqlite.connect(DB_PATH)
+    _writer.row_factory = aiosqlite.Row
+    for pragma in _WRITER_PRAGMAS:
+        await _writer.execute(pragma)
+    await _writer.executescript(SCHEMA)
+
+    # Databases created before the epoch-seconds switch hold ISO strings in
+    # a TEXT-affinity created_at column; those sort above every numeric
+    # value, so new rows would sink to the bottom of the dashboard. Convert
+    # them once here. (strftime('%s', …) rather than unixepoch() — the
+    # latter needs SQLite ≥ 3.38.)
+    for table in ("users", "documents"):
+        await _writer.execute(
+            f"UPDATE {table} "
+            "SET created_at = CAST(strftime('%s', created_at) AS REAL) "
+            "WHERE created_at LIKE '____-%'"
+        )
+    await _writer.commit()
+
+    _readers = asyncio.Queue(maxsize=READER_POOL_SIZE)
+    for _ in range(READER_POOL_SIZE):
+        db = await aiosqlite.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        db.row_factory = aiosqlite.Row
+        for pragma in _READER_PRAGMAS:
+            await db.execute(pragma)
+        _readers.put_nowait(db)
+
+    _batcher.start()
     logger.info("SQLite database ready")
 
 
+async def close_db():
+    """Close the shared connections (app shutdown)."""
+    global _writer, _readers
+    await _batcher.stop()
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
+    if _readers is not None:
+        while not _readers.empty():
+            await _readers.get_nowait().close()
+        _readers = None
+
+
+@asynccontextmanager
+async def _reader():
+    """Borrow a read-only connection from the pool."""
+    db = await _readers.get()
+    try:
+        yield db
+    finally:
+        _readers.put_nowait(db)
+
+
+class WriteBatcher:
+    """Coalesce concurrent INSERTs into one transaction.
+
+    Every COMMIT forces an fsync, so N concurrent saves used to cost N
+    fsyncs. Writes are queued and a background task drains whatever has
+    accumulated into a single BEGIN…COMMIT, resolving each caller's future
+    once the batch lands. Under no contention a write still commits
+    immediately — batching only kicks in when requests overlap.
+    """
+
+    MAX_BATCH = 256
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, sql: str, params: tuple) -> None:
+        """Queue a write and wait until its transaction commits."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((sql, params, future))
+        await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                for sql, params, _ in batch:
+                    await _writer.execute(sql, params)
+                await _writer.commit()
+            except Exception:
+                # One bad statement (e.g. a UNIQUE violation) must not fail
+                # the whole batch: roll back and replay each write in its own
+                # transaction so every caller gets its own outcome. The
+                # single-fsync fast path above still covers the common case.
+                await _writer.rollback()
+                for sql, params, future in batch:
+                    try:
+                        await _writer.execute(sql, params)
+                        await _writer.commit()
+                    except Exception as exc:
+                        await _writer.rollback()
+                        if not future.done():
+                            future.set_exception(exc)
+                    else:
+                        if not future.done():
+                            future.set_result(None)
+            else:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+
+_batcher = WriteBatcher()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # User CRUD
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Timestamps are stored as Unix epoch seconds (REAL): time.time() is a single
+# C call per insert, with ISO formatting deferred to read time. Legacy ISO
+# rows are converted to epoch seconds once at startup (see init_db).
+
+def _iso(ts) -> str:
+    if isinstance(ts, str):
+        # Legacy TEXT-affinity columns hand numbers back as strings.
+        try:
+            ts = float(ts)
+        except ValueError:
+            return ts
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
 async def create_user_sqlite(name: str, email: str, password_hash: str) -> dict:
-    uid = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT INTO users (uid, name, email, password_hash, created_at) VALUES (?,?,?,?,?)",
-            (uid, name, email, password_hash, now),
-        )
-        await db.commit()
-    return {"uid": uid, "name": name, "email": email, "created_at": now}
+    uid = secrets.token_hex(16)
+    now = time.time()
+    await _batcher.submit(
+        "INSERT INTO users (uid, name, email, password_hash, created_at) VALUES (?,?,?,?,?)",
+        (uid, name, email, password_hash, now),
+    )
+    return {"uid": uid, "name": name, "email": email, "created_at": _iso(now)}
 
 
 async def get_user_by_email_sqlite(email: str) -> Optional[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM users WHERE email = ?", (email,)
         ) as cursor:
@@ -104,19 +268,30 @@ async def get_user_by_email_sqlite(email: str) -> Optional[dict]:
 
 
 async def get_user_by_id_sqlite(uid: str) -> Optional[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT uid, name, email, created_at FROM users WHERE uid = ?", (uid,)
         ) as cursor:
             row = await cursor.fetchone()
-            return dict(row) if row else None
+            if not row:
+                return None
+            user = dict(row)
+            user["created_at"] = _iso(user["created_at"])
+            return user
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Document CRUD
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _row_to_document(row) -> dict:
+    """Convert a documents row to a dict, decoding the stored JSON structure."""
+    doc = dict(row)
+    if doc.get("cleaned_structure"):
+        doc["cleaned_structure"] = orjson.loads(doc["cleaned_structure"])
+    doc["created_at"] = _iso(doc["created_at"])
+    return doc
+
 async def save_document_sqlite(
     user_id: Optional[str],
     original_filename: str,
@@ -124,50 +299,52 @@ async def save_document_sqlite(
     cleaned_structure: dict,
     file_path: str,
 ) -> dict:
-    doc_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """INSERT INTO documents
-               (doc_id, user_id, original_filename, output_type, cleaned_structure, file_path, created_at)
-               VALUES (?,?,?,?,?,?,?)""",
-            (
-                doc_id,
-                user_id,
-                original_filename,
-                output_type,
-                json.dumps(cleaned_structure),
-                file_path,
-                now,
-            ),
-        )
-        await db.commit()
+    doc_id = secrets.token_hex(16)
+    now = time.time()
+    await _batcher.submit(
+        """INSERT INTO documents
+           (doc_id, user_id, original_filename, output_type, cleaned_structure, file_path, created_at)
+           VALUES (?,?,?,?,?,?,?)""",
+        (
+            doc_id,
+            user_id,
+            original_filename,
+            output_type,
+            orjson.dumps(cleaned_structure).decode(),
+            file_path,
+            now,
+        ),
+    )
     return {
         "doc_id": doc_id,
         "user_id": user_id,
         "original_filename": original_filename,
         "output_type": output_type,
         "file_path": file_path,
-        "created_at": now,
+        "created_at": _iso(now),
     }
 
 
 async def get_user_documents_sqlite(user_id: str) -> list[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    # List view deliberately skips cleaned_structure — the JSON blob can be
+    # multi-KB per row and only the detail endpoint needs it.
+    async with _reader() as db:
         async with db.execute(
-            "SELECT * FROM documents WHERE user_id = ? ORDER BY created_at DESC",
+            """SELECT doc_id, user_id, original_filename, output_type, file_path, created_at
+               FROM documents WHERE user_id = ? ORDER BY created_at DESC""",
             (user_id,),
         ) as cursor:
             rows = await cursor.fetchall()
-            return [dict(r) for r in rows]
+            docs = [dict(r) for r in rows]
+            for doc in docs:
+                doc["created_at"] = _iso(doc["created_at"])
+            return docs
 
 
 async def get_document_by_id_sqlite(doc_id: str) -> Optional[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reader() as db:
         async with db.execute(
             "SELECT * FROM documents WHERE doc_id = ?", (doc_id,)
         ) as cursor:
             row = await cursor.fetchone()
-            return dict(row) if row else None
+            return _row_to_document(row) if row else None
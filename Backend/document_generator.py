@@ -5,25 +5,247 @@ Table colour is applied consistently across both outputs.
 
 from __future__ import annotations
 import io
+import os
+import copy
+import asyncio
 import datetime
 import logging
-import re
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+from xml.sax.saxutils import escape as _xml_escape
+
+from docx import Document
+from docx.shared import Pt, Cm, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib import colors
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    Preformatted, HRFlowable,
+)
+from reportlab.lib.enums import TA_JUSTIFY
 
 from md_parser import DocumentModel, TableNode, ListNode, CodeBlock
 from html_renderer import SAFE_TABLE_COLORS, DEFAULT_COLOR
 
+# WeasyPrint availability is resolved once at import time; the hot path used
+# to attempt the import (and, when absent, re-import a dozen reportlab
+# symbols) on every PDF generated.
+try:
+    from weasyprint import HTML as _WeasyHTML
+except ImportError:
+    _WeasyHTML = None
+
+# lxml is pinned in requirements, but degrade gracefully to the stdlib
+# parser if it's missing from the environment.
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
+# The PDF fallback walker only consumes the cover <header>, the TOC <nav>,
+# and the <div class="section"> blocks; straining to those tags keeps the
+# large <style> block emitted by _build_css out of the tree entirely. The
+# strainer is stateless, so one shared instance serves every parse.
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+_PDF_STRAINER = SoupStrainer(["header", "nav", "div"])
+
 logger = logging.getLogger(__name__)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Output buffer pool
+# ─────────────────────────────────────────────────────────────────────────────
+# Generated documents run to several MB, so allocating a fresh BytesIO per
+# conversion is constant large-object churn under load. Buffers that stay
+# inside this module (the process-pool shims drain them to bytes before the
+# worker returns) are reset and reused; buffers handed to callers simply
+# never come back, and the pool refills on demand.
+
+_BUF_POOL: queue.LifoQueue = queue.LifoQueue(maxsize=32)
+
+
+def _acquire_buf() -> io.BytesIO:
+    try:
+        return _BUF_POOL.get_nowait()
+    except queue.Empty:
+        return io.BytesIO()
+
+
+def _release_buf(buf: io.BytesIO) -> None:
+    buf.seek(0)
+    buf.truncate(0)
+    try:
+        _BUF_POOL.put_nowait(buf)
+    except queue.Full:
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ReportLab style constants — immutable config, built once instead of per call
+# ─────────────────────────────────────────────────────────────────────────────
+# colors.HexColor parses its string and ParagraphStyle validates attributes on
+# every construction; these never change between requests. Only the styles
+# derived from the user-chosen palette are still built per call.
+
+_DARK  = colors.HexColor("#111827")
+_GRAY  = colors.HexColor("#1F2937")   # dark enough on white — fixes visibility
+_LIGHT = colors.HexColor("#4B5563")   # slightly lighter for meta text, still readable
+_CODE_BG     = colors.HexColor("#F3F4F6")
+_GRID_GRAY   = colors.HexColor("#E5E7EB")
+_STRIPE_EVEN = colors.HexColor("#FAFAFA")
+_STRIPE_ODD  = colors.HexColor("#F3F4F8")
+
+_STYLE_TITLE  = ParagraphStyle("DocTitle",  fontSize=24, leading=30, textColor=_DARK,  fontName="Helvetica-Bold", spaceAfter=4)
+_STYLE_META   = ParagraphStyle("DocMeta",   fontSize=8,  leading=12, textColor=_LIGHT, fontName="Helvetica",      spaceAfter=16)
+_STYLE_H1     = ParagraphStyle("H1",        fontSize=16, leading=22, textColor=_DARK,  fontName="Helvetica-Bold", spaceBefore=18, spaceAfter=6)
+_STYLE_H2     = ParagraphStyle("H2",        fontSize=13, leading=18, textColor=_DARK,  fontName="Helvetica-Bold", spaceBefore=14, spaceAfter=4)
+_STYLE_H3     = ParagraphStyle("H3",        fontSize=11, leading=16, textColor=_GRAY,  fontName="Helvetica-Bold", spaceBefore=10, spaceAfter=3)
+_STYLE_BODY   = ParagraphStyle("Body",      fontSize=10, leading=16, textColor=_GRAY,  fontName="Helvetica",      spaceAfter=8, alignment=TA_JUSTIFY)
+_STYLE_BULLET = ParagraphStyle("Bullet",    fontSize=10, leading=14, textColor=_GRAY,  fontName="Helvetica",      leftIndent=16, spaceAfter=3, bulletIndent=4)
+_STYLE_CODE   = ParagraphStyle("Code",      fontSize=8,  leading=12, textColor=_GRAY,
+                               fontName="Courier", backColor=_CODE_BG,
+                               leftIndent=12, rightIndent=12, spaceBefore=6, spaceAfter=6)
+_STYLE_CODE_LANG = ParagraphStyle("CodeLang", fontSize=7, fontName="Helvetica-Bold", textColor=_GRAY)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DOCX style constants — immutable config, built once instead of per call
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Pt() and RGBColor() validate and allocate on every construction; per-level
+# dicts and the body-text constants below keep them out of the section loops.
+_HEADING_PT  = {1: Pt(16), 2: Pt(13), 3: Pt(11), 4: Pt(10), 5: Pt(9), 6: Pt(9)}
+_HEADING_RGB = {
+    1: RGBColor(17, 24, 39),
+    2: RGBColor(31, 41, 55),
+    3: RGBColor(55, 65, 81),
+    4: RGBColor(75, 85, 99),
+    5: RGBColor(75, 85, 99),
+    6: RGBColor(75, 85, 99),
+}
+
+_TITLE_RGB = RGBColor(17, 24, 39)
+_META_RGB  = RGBColor(107, 114, 128)
+_BODY_RGB  = RGBColor(30, 30, 30)    # dark text — visible
+_CODE_RGB  = RGBColor(31, 41, 55)
+
+_PT_TITLE = Pt(28)
+_PT_META  = Pt(9)
+_PT_BODY  = Pt(10.5)
+_PT_CODE  = Pt(8.5)
+_PT_4  = Pt(4)
+_PT_6  = Pt(6)
+_PT_12 = Pt(12)
+_PT_18 = Pt(18)
+_CM_MARGIN = Cm(2.54)
+
+
+def _make_shading(fill: str) -> OxmlElement:
+    """Build a <w:shd> element with the given fill colour."""
+    shading = OxmlElement("w:shd")
+    shading.set(qn("w:fill"), fill)
+    shading.set(qn("w:color"), "auto")
+    shading.set(qn("w:val"), "clear")
+    return shading
+
+
+# Code-block background is fixed; deep-copy this template per block instead
+# of constructing the element attribute-by-attribute each time.
+_CODE_SHADING_TEMPLATE = _make_shading("F3F4F6")
+
+
+def _table_xml(tbl: TableNode, cols: int, hdr_fill: str, hdr_text_hex: str) -> str:
+    """Build a whole table as one OOXML string.
+
+    Assigning cell.text per cell makes python-docx rebuild each cell's
+    paragraph/run tree individually — 500 XML manipulations for a 50×10
+    table. Emitting the <w:tbl> as a single string and parsing it once
+    cuts that to one lxml parse.
+    """
+
+    def _cell(text: str, fill: str = "", run_props: str = "") -> str:
+        shd = f'<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/>' if fill else ""
+        return (
+            f"<w:tc><w:tcPr>{shd}</w:tcPr><w:p><w:r>{run_props}"
+            f'<w:t xml:space="preserve">{_xml_escape(text)}</w:t></w:r></w:p></w:tc>'
+        )
+
+    rows = []
+    if tbl.headers:
+        header_props = f'<w:rPr><w:b/><w:color w:val="{hdr_text_hex}"/></w:rPr>'
+        padded = list(tbl.headers) + [""] * (cols - len(tbl.headers))
+        rows.append(
+            "<w:tr>" + "".join(_cell(h, hdr_fill, header_props) for h in padded) + "</w:tr>"
+        )
+    body_props = '<w:rPr><w:color w:val="1E1E1E"/></w:rPr>'
+    for row_data in tbl.rows:
+        padded = list(row_data[:cols]) + [""] * (cols - len(row_data))
+        rows.append(
+            "<w:tr>" + "".join(_cell(c, run_props=body_props) for c in padded) + "</w:tr>"
+        )
+
+    return (
+        f'<w:tbl {nsdecls("w")}>'
+        '<w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/></w:tblPr>'
+        + "".join(rows)
+        + "</w:tbl>"
+    )
+
+
+# html.escape runs a chain of five str.replace passes per string; a single
+# str.translate pass over the codepoint array is markedly cheaper for the
+# many small cell/bullet strings the PDF fallback escapes.
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+
+def _esc_pdf(text: str) -> str:
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+
+def _pdf_table_style(accent_color, hdr_txt_color) -> TableStyle:
+    """Table style shared by the HTML-walking and model-walking PDF paths."""
+    return TableStyle([
+        ("BACKGROUND",    (0, 0), (-1, 0), accent_color),
+        ("TEXTCOLOR",     (0, 0), (-1, 0), hdr_txt_color),
+        ("FONTNAME",      (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE",      (0, 0), (-1, 0), 9),
+        ("ROWBACKGROUNDS",(0, 1), (-1, -1), [_STRIPE_EVEN, _STRIPE_ODD]),
+        ("GRID",          (0, 0), (-1, -1), 0.5, _GRID_GRAY),
+        ("TOPPADDING",    (0, 0), (-1, -1), 7),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
+        ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+        ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+        ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+    ])
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Helper — resolve colour palette
 # ─────────────────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=64)
 def _resolve_palette(table_color: str) -> dict:
     """Return the colour palette dict for the given key, falling back to default."""
     return SAFE_TABLE_COLORS.get(table_color, SAFE_TABLE_COLORS[DEFAULT_COLOR])
 
 
+@lru_cache(maxsize=64)
 def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
     """Convert '#RRGGBB' or 'RRGGBB' to (r, g, b) integers."""
     h = hex_color.lstrip("#")
@@ -34,27 +256,20 @@ def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
 # DOCX Generation
 # ─────────────────────────────────────────────────────────────────────────────
 
-def generate_docx(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> bytes:
+def generate_docx(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> io.BytesIO:
     """Generate a professional DOCX from DocumentModel using the chosen table colour."""
-    from docx import Document
-    from docx.shared import Pt, Cm, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
-
     palette = _resolve_palette(table_color)
-    hdr_rgb   = _hex_to_rgb(palette["bg"])
-    hdr_text  = _hex_to_rgb(palette["text"])
-    hdr_hex   = palette["bg"].lstrip("#").upper()   # for XML shading
+    hdr_hex      = palette["bg"].lstrip("#").upper()     # for XML shading
+    hdr_text_hex = palette["text"].lstrip("#").upper()
 
     doc = Document()
 
     # ── Margins ──
     for section in doc.sections:
-        section.top_margin    = Cm(2.54)
-        section.bottom_margin = Cm(2.54)
-        section.left_margin   = Cm(2.54)
-        section.right_margin  = Cm(2.54)
+        section.top_margin    = _CM_MARGIN
+        section.bottom_margin = _CM_MARGIN
+        section.left_margin   = _CM_MARGIN
+        section.right_margin  = _CM_MARGIN
 
     # ── Cover ──
     cover_title = doc.add_paragraph()
@@ -62,29 +277,19 @@ def generate_docx(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> byt
     run = cover_title.add_run(model.title)
     run.bold = True
     run.font.name = "Calibri"
-    run.font.size = Pt(28)
-    run.font.color.rgb = RGBColor(17, 24, 39)
+    run.font.size = _PT_TITLE
+    run.font.color.rgb = _TITLE_RGB
 
     meta = doc.add_paragraph()
     gen_date = datetime.datetime.utcnow().strftime("%B %d, %Y")
     run = meta.add_run(f"Technical Report  •  Generated {gen_date}")
     run.font.name = "Calibri"
-    run.font.size = Pt(9)
-    run.font.color.rgb = RGBColor(107, 114, 128)
+    run.font.size = _PT_META
+    run.font.color.rgb = _META_RGB
 
     doc.add_paragraph()  # spacer
 
     # ── Sections ──
-    heading_sizes  = {1: 16, 2: 13, 3: 11, 4: 10, 5: 9, 6: 9}
-    heading_colors = {
-        1: (17, 24, 39),
-        2: (31, 41, 55),
-        3: (55, 65, 81),
-        4: (75, 85, 99),
-        5: (75, 85, 99),
-        6: (75, 85, 99),
-    }
-
     for sec in model.sections:
         if sec.heading:
             lvl = max(1, min(sec.level, 6))
@@ -92,51 +297,28 @@ def generate_docx(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> byt
             run = h.add_run(sec.heading)
             run.bold = True
             run.font.name = "Calibri"
-            run.font.size = Pt(heading_sizes.get(lvl, 11))
-            run.font.color.rgb = RGBColor(*heading_colors.get(lvl, (17, 24, 39)))
-            h.paragraph_format.space_before = Pt(12)
-            h.paragraph_format.space_after  = Pt(4)
+            run.font.size = _HEADING_PT[lvl]
+            run.font.color.rgb = _HEADING_RGB[lvl]
+            h.paragraph_format.space_before = _PT_12
+            h.paragraph_format.space_after  = _PT_4
 
         for para_text in sec.content:
             p = doc.add_paragraph()
             run = p.add_run(para_text)
             run.font.name = "Calibri"
-            run.font.size = Pt(10.5)
-            run.font.color.rgb = RGBColor(30, 30, 30)   # dark text — visible
-            p.paragraph_format.space_after = Pt(6)
+            run.font.size = _PT_BODY
+            run.font.color.rgb = _BODY_RGB
+            p.paragraph_format.space_after = _PT_6
 
         for tbl in sec.tables:
             if not tbl.headers and not tbl.rows:
                 continue
-            total_rows = (1 if tbl.headers else 0) + len(tbl.rows)
             cols = max(len(tbl.headers), max((len(r) for r in tbl.rows), default=0))
             if cols == 0:
                 continue
-            t = doc.add_table(rows=total_rows, cols=cols)
-            t.style = "Table Grid"
-            row_idx = 0
-            if tbl.headers:
-                for ci, h_text in enumerate(tbl.headers):
-                    cell = t.rows[0].cells[ci]
-                    cell.text = h_text
-                    for run in cell.paragraphs[0].runs:
-                        run.bold = True
-                        run.font.color.rgb = RGBColor(*hdr_text)
-                    # User-chosen header background
-                    shading = OxmlElement("w:shd")
-                    shading.set(qn("w:fill"), hdr_hex)
-                    shading.set(qn("w:color"), "auto")
-                    shading.set(qn("w:val"), "clear")
-                    cell._tc.get_or_add_tcPr().append(shading)
-                row_idx = 1
-            for row_data in tbl.rows:
-                for ci, cell_text in enumerate(row_data):
-                    if ci < cols:
-                        cell = t.rows[row_idx].cells[ci]
-                        cell.text = cell_text
-                        for run in cell.paragraphs[0].runs:
-                            run.font.color.rgb = RGBColor(30, 30, 30)
-                row_idx += 1
+            doc.element.body.append(
+                parse_xml(_table_xml(tbl, cols, hdr_hex, hdr_text_hex))
+            )
             doc.add_paragraph()  # spacer
 
         for lst in sec.lists:
@@ -145,63 +327,54 @@ def generate_docx(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> byt
                 p = doc.add_paragraph(item, style=style)
                 if p.runs:
                     p.runs[0].font.name = "Calibri"
-                    p.runs[0].font.size = Pt(10.5)
-                    p.runs[0].font.color.rgb = RGBColor(30, 30, 30)
+                    p.runs[0].font.size = _PT_BODY
+                    p.runs[0].font.color.rgb = _BODY_RGB
 
         for cb in sec.code_blocks:
             lang_hint = f"[{cb.language}]  " if cb.language else ""
             p = doc.add_paragraph()
             run = p.add_run(lang_hint + cb.code)
             run.font.name = "Cascadia Code"
-            run.font.size = Pt(8.5)
-            run.font.color.rgb = RGBColor(31, 41, 55)
-            p.paragraph_format.left_indent = Pt(18)
+            run.font.size = _PT_CODE
+            run.font.color.rgb = _CODE_RGB
+            p.paragraph_format.left_indent = _PT_18
             pPr = p._p.get_or_add_pPr()
-            shading = OxmlElement("w:shd")
-            shading.set(qn("w:fill"), "F3F4F6")
-            shading.set(qn("w:color"), "auto")
-            shading.set(qn("w:val"), "clear")
-            pPr.append(shading)
+            pPr.append(copy.deepcopy(_CODE_SHADING_TEMPLATE))
             doc.add_paragraph()
 
     # ── Footer ──
     doc.core_properties.description = f"Generated by Crimson Scriveners on {gen_date}"
     doc.core_properties.subject = "Technical Report"
 
-    buf = io.BytesIO()
+    buf = _acquire_buf()
     doc.save(buf)
     buf.seek(0)
-    return buf.read()
+    return buf
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PDF Generation
 # ─────────────────────────────────────────────────────────────────────────────
 
-def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
-    """Generate PDF from HTML. Uses WeasyPrint when available, falls back to ReportLab."""
+def generate_pdf(
+    html_content: Optional[str] = None,
+    table_color: str = DEFAULT_COLOR,
+    soup=None,
+) -> io.BytesIO:
+    """Generate PDF from HTML. Uses WeasyPrint when available, falls back to ReportLab.
+
+    Callers that already parsed the HTML (e.g. to audit it) can pass the
+    BeautifulSoup tree via ``soup`` so the fallback path doesn't re-parse
+    the same document.
+    """
+    if html_content is None and soup is None:
+        raise ValueError("generate_pdf needs html_content or a pre-parsed soup")
 
     # ── WeasyPrint path (preserves full CSS including the user-chosen colour) ──
-    try:
-        from weasyprint import HTML as WH
-        pdf_bytes = WH(string=html_content).write_pdf()
-        return pdf_bytes
-    except ImportError:
-        pass
+    if _WeasyHTML is not None and html_content is not None:
+        return io.BytesIO(_WeasyHTML(string=html_content).write_pdf())
 
     # ── ReportLab fallback: parse HTML and rebuild with chosen palette ─────────
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-    from reportlab.lib import colors
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        Preformatted, HRFlowable,
-    )
-    from reportlab.lib.enums import TA_JUSTIFY
-    from bs4 import BeautifulSoup
-    import html as html_mod
-
     palette  = _resolve_palette(table_color)
     hdr_hex  = palette["bg"]       # e.g. "#475569"
     hdr_text = palette["text"]     # e.g. "#ffffff"
@@ -209,11 +382,7 @@ def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
     accent_color = colors.HexColor(hdr_hex)
     hdr_txt_color = colors.HexColor(hdr_text)
 
-    dark  = colors.HexColor("#111827")
-    gray  = colors.HexColor("#1F2937")   # dark enough on white — fixes visibility
-    light = colors.HexColor("#4B5563")   # slightly lighter for meta text, still readable
-
-    buf = io.BytesIO()
+    buf = _acquire_buf()
     doc = SimpleDocTemplate(
         buf,
         pagesize=A4,
@@ -223,58 +392,59 @@ def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
         bottomMargin=cm * 2.54,
     )
 
-    style_title  = ParagraphStyle("DocTitle",  fontSize=24, leading=30, textColor=dark,  fontName="Helvetica-Bold", spaceAfter=4)
-    style_meta   = ParagraphStyle("DocMeta",   fontSize=8,  leading=12, textColor=light, fontName="Helvetica",      spaceAfter=16)
-    style_h1     = ParagraphStyle("H1",        fontSize=16, leading=22, textColor=dark,  fontName="Helvetica-Bold", spaceBefore=18, spaceAfter=6)
-    style_h2     = ParagraphStyle("H2",        fontSize=13, leading=18, textColor=dark,  fontName="Helvetica-Bold", spaceBefore=14, spaceAfter=4)
-    style_h3     = ParagraphStyle("H3",        fontSize=11, leading=16, textColor=gray,  fontName="Helvetica-Bold", spaceBefore=10, spaceAfter=3)
-    style_body   = ParagraphStyle("Body",      fontSize=10, leading=16, textColor=gray,  fontName="Helvetica",      spaceAfter=8, alignment=TA_JUSTIFY)
-    style_bullet = ParagraphStyle("Bullet",    fontSize=10, leading=14, textColor=gray,  fontName="Helvetica",      leftIndent=16, spaceAfter=3, bulletIndent=4)
-    style_code   = ParagraphStyle("Code",      fontSize=8,  leading=12, textColor=colors.HexColor("#1F2937"),
-                                  fontName="Courier", backColor=colors.HexColor("#F3F4F6"),
-                                  leftIndent=12, rightIndent=12, spaceBefore=6, spaceAfter=6)
-    style_toc_hdr = ParagraphStyle("TocHdr",  fontSize=9,  leading=14, textColor=accent_color, fontName="Helvetica-Bold", spaceAfter=4)
-
-    soup = BeautifulSoup(html_content, "html.parser")
-    story = []
+    # Only these two styles depend on the palette; build them once per call,
+    # not per header cell.
+    style_toc_hdr = ParagraphStyle("TocHdr", fontSize=9, leading=14, textColor=accent_color, fontName="Helvetica-Bold", spaceAfter=4)
+    style_th = ParagraphStyle("TH", fontSize=9, fontName="Helvetica-Bold", textColor=hdr_txt_color)
 
-    # Cover
-    title_tag = soup.find(class_="doc-title")
-    meta_tag  = soup.find(class_="doc-meta")
-    if title_tag:
-        story.append(Paragraph(html_mod.escape(title_tag.get_text()), style_title))
-    if meta_tag:
-        story.append(Paragraph(html_mod.escape(meta_tag.get_text()), style_meta))
-    story.append(HRFlowable(width="100%", thickness=2.5, color=accent_color, spaceAfter=20))
+    # lxml is C-backed and an order of magnitude faster than the pure-Python
+    # html.parser on README-sized documents (it's already pinned for bs4).
+    if soup is None:
+        soup = BeautifulSoup(html_content, _BS_PARSER, parse_only=_PDF_STRAINER)
+    story = []
 
-    # TOC
-    toc_div = soup.find(class_="toc")
-    if toc_div:
+    # Single pass over the document: the renderer emits cover, TOC, and
+    # sections as direct children of <body> in order, so one walk with a
+    # class-dispatch replaces the previous find()/find_all() passes that
+    # each traversed the whole tree.
+
+    def _handle_cover(node):
+        title_tag = node.find(class_="doc-title")
+        meta_tag  = node.find(class_="doc-meta")
+        if title_tag:
+            story.append(Paragraph(_esc_pdf(title_tag.get_text()), _STYLE_TITLE))
+        if meta_tag:
+            story.append(Paragraph(_esc_pdf(meta_tag.get_text()), _STYLE_META))
+        story.append(HRFlowable(width="100%", thickness=2.5, color=accent_color, spaceAfter=20))
+
+    def _handle_toc(node):
         story.append(Paragraph("Table of Contents", style_toc_hdr))
-        for li in toc_div.find_all("li"):
-            story.append(Paragraph(f"• {html_mod.escape(li.get_text())}", style_bullet))
+        for li in node.find_all("li"):
+            story.append(Paragraph(f"• {_esc_pdf(li.get_text())}", _STYLE_BULLET))
         story.append(Spacer(1, 20))
 
-    # Walk sections
-    for section_div in soup.find_all(class_="section"):
+    def _handle_section(section_div):
+        # One isinstance check skips the whitespace text nodes between
+        # elements; membership tests run on the class list bs4 already
+        # holds, with no per-child join allocation.
         for child in section_div.children:
-            if not hasattr(child, "name") or not child.name:
+            if not isinstance(child, Tag):
                 continue
             tag = child.name
-            cls = " ".join(child.get("class", []))
+            cls = child.get("class", ())
 
             if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
                 lvl = int(tag[1])
-                s = {1: style_h1, 2: style_h2, 3: style_h3}.get(lvl, style_h3)
-                story.append(Paragraph(html_mod.escape(child.get_text()), s))
+                s = {1: _STYLE_H1, 2: _STYLE_H2, 3: _STYLE_H3}.get(lvl, _STYLE_H3)
+                story.append(Paragraph(_esc_pdf(child.get_text()), s))
                 if lvl == 1:
                     story.append(HRFlowable(width="100%", thickness=1.5, color=accent_color, spaceAfter=8))
 
             elif tag == "p" and "doc-paragraph" in cls:
-                story.append(Paragraph(html_mod.escape(child.get_text()), style_body))
+                story.append(Paragraph(_esc_pdf(child.get_text()), _STYLE_BODY))
 
             elif tag == "blockquote" or "doc-blockquote" in cls:
-                story.append(Paragraph(html_mod.escape(child.get_text()), style_bullet))
+                story.append(Paragraph(_esc_pdf(child.get_text()), _STYLE_BULLET))
 
             elif "doc-table-wrapper" in cls:
                 tbl_el = child.find("table")
@@ -283,35 +453,21 @@ def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
                     header_row = tbl_el.find("thead")
                     if header_row:
                         cells = [
-                            Paragraph(html_mod.escape(th.get_text()),
-                                      ParagraphStyle("TH", fontSize=9, fontName="Helvetica-Bold", textColor=hdr_txt_color))
+                            Paragraph(_esc_pdf(th.get_text()), style_th)
                             for th in header_row.find_all("th")
                         ]
                         rows_data.append(cells)
                     tbody = tbl_el.find("tbody")
                     if tbody:
                         for tr in tbody.find_all("tr"):
-                            cells = [Paragraph(html_mod.escape(td.get_text()), style_body) for td in tr.find_all("td")]
+                            cells = [Paragraph(_esc_pdf(td.get_text()), _STYLE_BODY) for td in tr.find_all("td")]
                             if cells:
                                 rows_data.append(cells)
 
                     if rows_data:
                         try:
                             t = Table(rows_data, repeatRows=1 if header_row else 0)
-                            ts = [
-                                ("BACKGROUND",    (0, 0), (-1, 0), accent_color),
-                                ("TEXTCOLOR",     (0, 0), (-1, 0), hdr_txt_color),
-                                ("FONTNAME",      (0, 0), (-1, 0), "Helvetica-Bold"),
-                                ("FONTSIZE",      (0, 0), (-1, 0), 9),
-                                ("ROWBACKGROUNDS",(0, 1), (-1, -1), [colors.HexColor("#FAFAFA"), colors.HexColor("#F3F4F8")]),
-                                ("GRID",          (0, 0), (-1, -1), 0.5, colors.HexColor("#E5E7EB")),
-                                ("TOPPADDING",    (0, 0), (-1, -1), 7),
-                                ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
-                                ("LEFTPADDING",   (0, 0), (-1, -1), 10),
-                                ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
-                                ("VALIGN",        (0, 0), (-1, -1), "TOP"),
-                            ]
-                            t.setStyle(TableStyle(ts))
+                            t.setStyle(_pdf_table_style(accent_color, hdr_txt_color))
                             story.append(t)
                             story.append(Spacer(1, 12))
                         except Exception:
@@ -319,7 +475,7 @@ def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
 
             elif "doc-list" in cls:
                 for li in child.find_all("li"):
-                    story.append(Paragraph(f"• {html_mod.escape(li.get_text())}", style_bullet))
+                    story.append(Paragraph(f"• {_esc_pdf(li.get_text())}", _STYLE_BULLET))
                 story.append(Spacer(1, 6))
 
             elif "doc-code-wrapper" in cls:
@@ -329,19 +485,215 @@ def generate_pdf(html_content: str, table_color: str = DEFAULT_COLOR) -> bytes:
                     code_text = code_el.get_text()
                     if lang_el:
                         story.append(Paragraph(
-                            f"[{html_mod.escape(lang_el.get_text())}]",
-                            ParagraphStyle("CodeLang", fontSize=7, fontName="Helvetica-Bold", textColor=gray),
+                            f"[{_esc_pdf(lang_el.get_text())}]",
+                            _STYLE_CODE_LANG,
                         ))
                     try:
-                        story.append(Preformatted(code_text, style_code))
+                        story.append(Preformatted(code_text, _STYLE_CODE))
                     except Exception:
-                        story.append(Paragraph(html_mod.escape(code_text[:500]), style_body))
+                        story.append(Paragraph(_esc_pdf(code_text[:500]), _STYLE_BODY))
                     story.append(Spacer(1, 8))
 
+    handlers = {
+        "doc-cover": _handle_cover,
+        "toc": _handle_toc,
+        "section": _handle_section,
+    }
+
+    # With parse_only the strained elements sit at the top of the soup
+    # (there is no <body> node); without it they live under body.
+    root = soup.body or soup
+    for node in root.children:
+        if not isinstance(node, Tag):
+            continue
+        for css_class in node.get("class", ()):
+            handler = handlers.get(css_class)
+            if handler is not None:
+                handler(node)
+                break
+
     story.append(Spacer(1, 40))
-    story.append(HRFlowable(width="100%", thickness=0.5, color=colors.HexColor("#E5E7EB")))
-    story.append(Paragraph("Generated by Crimson Scriveners Readme Forger", style_meta))
+    story.append(HRFlowable(width="100%", thickness=0.5, color=_GRID_GRAY))
+    story.append(Paragraph("Generated by Crimson Scriveners Readme Forger", _STYLE_META))
 
     doc.build(story)
     buf.seek(0)
-    return buf.read()
+    return buf
+
+
+def generate_pdf_from_model(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> io.BytesIO:
+    """Generate the fallback PDF straight from the DocumentModel.
+
+    render_html + BeautifulSoup round-trips the model through an HTML string
+    only to walk it back into flowables; when WeasyPrint isn't available
+    (so the CSS is unused anyway) this walks model.sections directly.
+    """
+    palette = _resolve_palette(table_color)
+    accent_color  = colors.HexColor(palette["bg"])
+    hdr_txt_color = colors.HexColor(palette["text"])
+
+    buf = _acquire_buf()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        rightMargin=cm * 2.54,
+        leftMargin=cm * 2.54,
+        topMargin=cm * 2.54,
+        bottomMargin=cm * 2.54,
+    )
+    style_toc_hdr = ParagraphStyle("TocHdr", fontSize=9, leading=14, textColor=accent_color, fontName="Helvetica-Bold", spaceAfter=4)
+    story = []
+
+    # Cover
+    story.append(Paragraph(_esc_pdf(model.title), _STYLE_TITLE))
+    story.append(Paragraph("Report by Crimson Scriveners • CSRF", _STYLE_META))
+    story.append(HRFlowable(width="100%", thickness=2.5, color=accent_color, spaceAfter=20))
+
+    # TOC — same numbering scheme as render_html
+    named_sections = [s for s in model.sections if s.heading]
+    if named_sections:
+        story.append(Paragraph("Table of Contents", style_toc_hdr))
+        counter: dict[int, int] = {}
+        for sec in named_sections:
+            lvl = sec.level
+            counter[lvl] = counter.get(lvl, 0) + 1
+            for deeper in list(counter.keys()):
+                if deeper > lvl:
+                    counter[deeper] = 0
+            num_str = ".".join(
+                str(counter.get(l, 0))
+                for l in sorted(k for k in counter if k <= lvl and counter.get(k, 0) > 0)
+            )
+            story.append(Paragraph(f"• {num_str} {_esc_pdf(sec.heading)}", _STYLE_BULLET))
+        story.append(Spacer(1, 20))
+
+    heading_styles = {1: _STYLE_H1, 2: _STYLE_H2, 3: _STYLE_H3}
+    th_style = ParagraphStyle("TH", fontSize=9, fontName="Helvetica-Bold", textColor=hdr_txt_color)
+
+    for sec in model.sections:
+        if sec.heading:
+            lvl = max(1, min(sec.level, 6))
+            story.append(Paragraph(_esc_pdf(sec.heading), heading_styles.get(lvl, _STYLE_H3)))
+            if lvl == 1:
+                story.append(HRFlowable(width="100%", thickness=1.5, color=accent_color, spaceAfter=8))
+
+        for para in sec.content:
+            stripped = para.strip()
+            if stripped.startswith(">"):
+                story.append(Paragraph(_esc_pdf(stripped.lstrip("> ").strip()), _STYLE_BULLET))
+            else:
+                story.append(Paragraph(_esc_pdf(stripped), _STYLE_BODY))
+
+        for tbl in sec.tables:
+            rows_data = []
+            if tbl.headers:
+                rows_data.append([Paragraph(_esc_pdf(h), th_style) for h in tbl.headers])
+            for row in tbl.rows:
+                cells = [Paragraph(_esc_pdf(c), _STYLE_BODY) for c in row]
+                if cells:
+                    rows_data.append(cells)
+            if rows_data:
+                try:
+                    t = Table(rows_data, repeatRows=1 if tbl.headers else 0)
+                    t.setStyle(_pdf_table_style(accent_color, hdr_txt_color))
+                    story.append(t)
+                    story.append(Spacer(1, 12))
+                except Exception:
+                    pass
+
+        for lst in sec.lists:
+            for item in lst.items:
+                story.append(Paragraph(f"• {_esc_pdf(item)}", _STYLE_BULLET))
+            story.append(Spacer(1, 6))
+
+        for cb in sec.code_blocks:
+            if cb.language:
+                story.append(Paragraph(f"[{_esc_pdf(cb.language)}]", _STYLE_CODE_LANG))
+            try:
+                story.append(Preformatted(cb.code, _STYLE_CODE))
+            except Exception:
+                story.append(Paragraph(_esc_pdf(cb.code[:500]), _STYLE_BODY))
+            story.append(Spacer(1, 8))
+
+    story.append(Spacer(1, 40))
+    story.append(HRFlowable(width="100%", thickness=0.5, color=_GRID_GRAY))
+    story.append(Paragraph("Generated by Crimson Scriveners Readme Forger", _STYLE_META))
+
+    doc.build(story)
+    buf.seek(0)
+    return buf
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Async wrappers — offload CPU-bound generation to a process pool
+# ─────────────────────────────────────────────────────────────────────────────
+# Both generators hold the GIL for hundreds of ms (docx XML serialization,
+# reportlab/WeasyPrint layout), which would serialize concurrent requests on
+# the event loop. The pool is created lazily so importing this module stays
+# cheap and worker processes only spawn once a conversion actually runs.
+
+_doc_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _warm_worker():
+    """Pre-warm per-worker caches at pool startup.
+
+    WeasyPrint's first render in a fresh process pays a multi-hundred-ms
+    font/CSS initialisation cost; rendering a trivial document at worker
+    startup moves that off the first request.
+    """
+    if _WeasyHTML is not None:
+        try:
+            _WeasyHTML(string="<p>warm</p>").write_pdf()
+        except Exception:
+            pass
+
+
+def _get_doc_pool() -> ProcessPoolExecutor:
+    global _doc_pool
+    if _doc_pool is None:
+        _doc_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), initializer=_warm_worker
+        )
+    return _doc_pool
+
+
+# BytesIO isn't picklable, so the pool transports raw bytes and the wrapper
+# re-wraps them for streaming — one transport copy instead of the previous
+# read() + re-wrap pair.
+
+def _docx_bytes(model: DocumentModel, table_color: str) -> bytes:
+    buf = generate_docx(model, table_color)
+    try:
+        return buf.getvalue()
+    finally:
+        _release_buf(buf)
+
+
+def _pdf_bytes(html_content: str, table_color: str, model: Optional[DocumentModel] = None) -> bytes:
+    # WeasyPrint consumes the HTML (CSS included); the reportlab fallback is
+    # cheaper fed from the model directly, skipping the HTML re-parse.
+    if _WeasyHTML is None and model is not None:
+        buf = generate_pdf_from_model(model, table_color)
+    else:
+        buf = generate_pdf(html_content, table_color)
+    try:
+        return buf.getvalue()
+    finally:
+        _release_buf(buf)
+
+
+async def generate_docx_async(model: DocumentModel, table_color: str = DEFAULT_COLOR) -> bytes:
+    """Run generate_docx in a worker process; returns the document bytes."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_doc_pool(), _docx_bytes, model, table_color)
+
+
+async def generate_pdf_async(
+    html_content: str,
+    table_color: str = DEFAULT_COLOR,
+    model: Optional[DocumentModel] = None,
+) -> bytes:
+    """Run PDF generation in a worker process; returns the document bytes."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_doc_pool(), _pdf_bytes, html_content, table_color, model)
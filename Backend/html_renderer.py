@@ -4,7 +4,9 @@ technical report with a user-selectable table accent colour.
 """
 
 from __future__ import annotations
-import html as html_lib
+import io
+import string
+from functools import lru_cache
 from md_parser import DocumentModel, Section
 
 # ---------------------------------------------------------------------------
@@ -36,13 +38,16 @@ DEFAULT_COLOR = "default"
 # CSS builder — injects chosen table colours at render-time
 # ---------------------------------------------------------------------------
 
-def _build_css(table_header_bg: str, table_header_text: str, table_stripe_bg: str) -> str:
-    return f"""
+# The CSS only varies in the three palette colours, so it lives as a plain
+# string.Template (no brace doubling, unlike an f-string) and the rendered
+# result is cached per palette — repeated renders of the same colour, the
+# common case, reuse one string.
+_CSS_TEMPLATE = string.Template("""
 @import url('https://fonts.googleapis.com/css2?family=Source+Serif+4:ital,wght@0,300;0,400;0,600;0,700;1,400&family=JetBrains+Mono:wght@400;500&display=swap');
 
-*, *::before, *::after {{ box-sizing: border-box; margin: 0; padding: 0; }}
+*, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
 
-body {{
+body {
   font-family: 'Source Serif 4', Georgia, 'Times New Roman', serif;
   font-size: 11pt;
   line-height: 1.8;
@@ -51,55 +56,55 @@ body {{
   max-width: 860px;
   margin: 0 auto;
   padding: 72px 80px;
-}}
+}
 
-@media print {{
-  body {{ padding: 0; max-width: 100%; }}
-  .no-break {{ page-break-inside: avoid; }}
-  .page-break {{ page-break-before: always; }}
-  a {{ color: inherit; text-decoration: none; }}
-}}
+@media print {
+  body { padding: 0; max-width: 100%; }
+  .no-break { page-break-inside: avoid; }
+  .page-break { page-break-before: always; }
+  a { color: inherit; text-decoration: none; }
+}
 
 /* ── Cover page ── */
-.doc-cover {{
+.doc-cover {
   padding: 60px 0 48px;
   border-bottom: 2px solid #000;
   margin-bottom: 56px;
-}}
-.doc-cover .doc-title {{
+}
+.doc-cover .doc-title {
   font-size: 24pt;
   font-weight: 700;
   color: #000;
   line-height: 1.25;
   margin-bottom: 14px;
   letter-spacing: -0.3px;
-}}
-.doc-cover .doc-meta {{
+}
+.doc-cover .doc-meta {
   font-family: 'JetBrains Mono', 'Courier New', monospace;
   font-size: 8.5pt;
   color: #444;
   letter-spacing: 0.4px;
   margin-bottom: 6px;
-}}
-.doc-cover .doc-rule {{
+}
+.doc-cover .doc-rule {
   width: 48px;
   height: 2px;
   background: #000;
   margin: 20px 0 14px;
-}}
-.doc-cover .doc-generated {{
+}
+.doc-cover .doc-generated {
   font-size: 8pt;
   color: #666;
   font-family: 'JetBrains Mono', monospace;
-}}
+}
 
 /* ── Table of Contents ── */
-.toc {{
+.toc {
   border: 1px solid #ccc;
   padding: 24px 28px;
   margin-bottom: 56px;
-}}
-.toc-title {{
+}
+.toc-title {
   font-size: 8.5pt;
   font-weight: 700;
   letter-spacing: 2px;
@@ -108,12 +113,12 @@ body {{
   margin-bottom: 16px;
   border-bottom: 1px solid #ddd;
   padding-bottom: 8px;
-}}
-.toc ol {{
+}
+.toc ol {
   padding-left: 0;
   list-style: none;
-}}
-.toc li {{
+}
+.toc li {
   font-size: 9.5pt;
   color: #222;
   padding: 3px 0;
@@ -121,51 +126,51 @@ body {{
   display: flex;
   align-items: baseline;
   gap: 6px;
-}}
-.toc li .toc-num {{
+}
+.toc li .toc-num {
   font-family: 'JetBrains Mono', monospace;
   font-size: 8pt;
   color: #666;
   min-width: 28px;
   flex-shrink: 0;
-}}
-.toc li.indent-1 {{ padding-left: 20px; }}
-.toc li.indent-2 {{ padding-left: 40px; }}
-.toc li.indent-3 {{ padding-left: 56px; }}
+}
+.toc li.indent-1 { padding-left: 20px; }
+.toc li.indent-2 { padding-left: 40px; }
+.toc li.indent-3 { padding-left: 56px; }
 
 /* ── Sections ── */
-.section {{ margin-bottom: 44px; }}
-.section-heading {{ margin-bottom: 14px; color: #000; }}
-.section-heading.level-1 {{
+.section { margin-bottom: 44px; }
+.section-heading { margin-bottom: 14px; color: #000; }
+.section-heading.level-1 {
   font-size: 18pt; font-weight: 700;
   border-bottom: 2px solid #000;
   padding-bottom: 6px; margin-top: 48px;
-}}
-.section-heading.level-2 {{
+}
+.section-heading.level-2 {
   font-size: 14pt; font-weight: 700;
   border-bottom: 1px solid #bbb;
   padding-bottom: 4px; margin-top: 36px;
-}}
-.section-heading.level-3 {{ font-size: 11.5pt; font-weight: 700; margin-top: 28px; }}
+}
+.section-heading.level-3 { font-size: 11.5pt; font-weight: 700; margin-top: 28px; }
 .section-heading.level-4,
 .section-heading.level-5,
-.section-heading.level-6 {{
+.section-heading.level-6 {
   font-size: 10.5pt; font-weight: 700;
   text-transform: uppercase;
   letter-spacing: 0.6px; font-style: italic; margin-top: 24px;
-}}
+}
 
 /* ── Body text ── */
-.doc-paragraph {{
+.doc-paragraph {
   margin-bottom: 14px;
   color: #111;
   font-size: 10.5pt;
   text-align: justify;
   hyphens: auto;
-}}
+}
 
 /* ── Blockquote ── */
-.doc-blockquote {{
+.doc-blockquote {
   margin: 18px 0;
   padding: 14px 20px;
   border-left: 3px solid #888;
@@ -173,49 +178,49 @@ body {{
   font-style: italic;
   color: #333;
   font-size: 10.5pt;
-}}
-.doc-blockquote p {{ margin: 0; text-align: left; }}
+}
+.doc-blockquote p { margin: 0; text-align: left; }
 
 /* ── Tables ── */
-.doc-table-wrapper {{ overflow-x: auto; margin: 20px 0 24px; }}
-.doc-table {{
+.doc-table-wrapper { overflow-x: auto; margin: 20px 0 24px; }
+.doc-table {
   width: 100%;
   border-collapse: collapse;
   font-size: 9pt;
-}}
-.doc-table thead tr {{
-  background: {table_header_bg};
-  color: {table_header_text};
-}}
-.doc-table thead th {{
+}
+.doc-table thead tr {
+  background: $bg;
+  color: $text;
+}
+.doc-table thead th {
   padding: 8px 12px;
   text-align: left;
   font-weight: 600;
   font-size: 8.5pt;
   letter-spacing: 0.3px;
-  border: 1px solid {table_header_bg};
-}}
-.doc-table tbody tr:nth-child(even) {{ background: {table_stripe_bg}; }}
-.doc-table tbody tr:nth-child(odd)  {{ background: #fff; }}
-.doc-table tbody td {{
+  border: 1px solid $bg;
+}
+.doc-table tbody tr:nth-child(even) { background: $stripe; }
+.doc-table tbody tr:nth-child(odd)  { background: #fff; }
+.doc-table tbody td {
   padding: 7px 12px;
   border: 1px solid #ccc;
   color: #111;
   vertical-align: top;
   font-size: 9pt;
   line-height: 1.5;
-}}
-.doc-table tbody td:first-child {{ font-weight: 500; }}
+}
+.doc-table tbody td:first-child { font-weight: 500; }
 
 /* ── Lists ── */
-.doc-list {{ margin: 10px 0 14px 0; padding-left: 24px; }}
-.doc-list.ordered  {{ list-style: decimal; }}
-.doc-list.unordered {{ list-style: disc; }}
-.doc-list li {{ margin-bottom: 4px; color: #111; font-size: 10.5pt; line-height: 1.65; }}
+.doc-list { margin: 10px 0 14px 0; padding-left: 24px; }
+.doc-list.ordered  { list-style: decimal; }
+.doc-list.unordered { list-style: disc; }
+.doc-list li { margin-bottom: 4px; color: #111; font-size: 10.5pt; line-height: 1.65; }
 
 /* ── Code blocks ── */
-.doc-code-wrapper {{ margin: 14px 0 20px; border: 1px solid #ccc; }}
-.doc-code-lang {{
+.doc-code-wrapper { margin: 14px 0 20px; border: 1px solid #ccc; }
+.doc-code-lang {
   background: #111;
   color: #ccc;
   font-family: 'JetBrains Mono', 'Courier New', monospace;
@@ -223,8 +228,8 @@ body {{
   padding: 4px 12px;
   letter-spacing: 0.8px;
   text-transform: uppercase;
-}}
-.doc-code {{
+}
+.doc-code {
   display: block;
   padding: 16px;
   background: #fafafa;
@@ -235,10 +240,10 @@ body {{
   overflow-x: auto;
   white-space: pre;
   border-top: 1px solid #ddd;
-}}
+}
 
 /* ── Footer ── */
-.doc-footer {{
+.doc-footer {
   margin-top: 64px;
   padding-top: 12px;
   border-top: 1px solid #bbb;
@@ -247,92 +252,104 @@ body {{
   font-size: 7.5pt;
   color: #888;
   font-family: 'JetBrains Mono', monospace;
-}}
-"""
+}
+""")
+
+
+@lru_cache(maxsize=32)
+def _build_css(table_header_bg: str, table_header_text: str, table_stripe_bg: str) -> str:
+    return _CSS_TEMPLATE.substitute(
+        bg=table_header_bg, text=table_header_text, stripe=table_stripe_bg
+    )
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _esc(text: str) -> str:
-    return html_lib.escape(str(text))
-
+# html.escape runs up to five .replace() passes per string; a translate
+# table does all substitutions in one C-level pass, which matters in the
+# per-cell inner loop of _render_table.
+_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
 
-def _render_table(table) -> str:
-    if not table.headers and not table.rows:
-        return ""
 
-    def _cell_html(text: str) -> str:
-        return html_lib.escape(str(text), quote=True)
+def _esc(text: str) -> str:
+    return str(text).translate(_ESCAPE_TABLE)
 
-    headers_html = "".join(f"<th>{_cell_html(h)}</th>" for h in table.headers)
-    thead = f"<thead><tr>{headers_html}</tr></thead>" if table.headers else ""
 
-    rows_html = "\n".join(
-        "<tr>" + "".join(f"<td>{_cell_html(cell)}</td>" for cell in row) + "</tr>"
-        for row in table.rows
-    )
-    return f"""
-    <div class="doc-table-wrapper no-break">
-      <table class="doc-table">
-        {thead}
-        <tbody>{rows_html}</tbody>
-      </table>
-    </div>"""
+_cell_html = _esc
 
 
-def _render_list(lst) -> str:
+def _render_table(table, write) -> None:
+    if not table.headers and not table.rows:
+        return
+
+    write('\n    <div class="doc-table-wrapper no-break">\n      <table class="doc-table">\n        ')
+    if table.headers:
+        write("<thead><tr>")
+        for h in table.headers:
+            write(f"<th>{_cell_html(h)}</th>")
+        write("</tr></thead>")
+    write("\n        <tbody>")
+    for row in table.rows:
+        write("<tr>")
+        for cell in row:
+            write(f"<td>{_cell_html(cell)}</td>")
+        write("</tr>")
+    write("</tbody>\n      </table>\n    </div>")
+
+
+def _render_list(lst, write) -> None:
     tag = "ol" if lst.ordered else "ul"
     cls = "ordered" if lst.ordered else "unordered"
-    items = "\n".join(f"<li>{_esc(item)}</li>" for item in lst.items)
-    return f'<{tag} class="doc-list {cls}">{items}</{tag}>'
+    write(f'<{tag} class="doc-list {cls}">')
+    for item in lst.items:
+        write(f"<li>{_esc(item)}</li>")
+    write(f"</{tag}>")
 
 
-def _render_code_block(block) -> str:
-    lang_label = (
-        f'<div class="doc-code-lang">{_esc(block.language)}</div>'
-        if block.language else
-        '<div class="doc-code-lang">code</div>'
-    )
-    return f"""
-    <div class="doc-code-wrapper no-break">
-      {lang_label}
-      <code class="doc-code">{_esc(block.code)}</code>
-    </div>"""
+def _render_code_block(block, write) -> None:
+    lang = _esc(block.language) if block.language else "code"
+    write('\n    <div class="doc-code-wrapper no-break">\n      ')
+    write(f'<div class="doc-code-lang">{lang}</div>')
+    write(f'\n      <code class="doc-code">{_esc(block.code)}</code>\n    </div>')
 
 
 def _is_blockquote_line(text: str) -> bool:
     return text.startswith("> ") or text.startswith(">")
 
 
-def _render_section(section: Section) -> str:
-    parts = []
+def _render_section(section: Section, write) -> None:
+    write('<div class="section">')
 
     if section.heading:
         lvl = max(1, min(section.level, 6))
-        parts.append(
-            f'<h{lvl} class="section-heading level-{lvl}">{_esc(section.heading)}</h{lvl}>'
-        )
+        write(f'<h{lvl} class="section-heading level-{lvl}">{_esc(section.heading)}</h{lvl}>')
 
     for para in section.content:
         stripped = para.strip()
         if _is_blockquote_line(stripped):
             inner = stripped.lstrip("> ").strip()
-            parts.append(f'<blockquote class="doc-blockquote"><p>{_esc(inner)}</p></blockquote>')
+            write(f'<blockquote class="doc-blockquote"><p>{_esc(inner)}</p></blockquote>')
         else:
-            parts.append(f'<p class="doc-paragraph">{_esc(stripped)}</p>')
+            write(f'<p class="doc-paragraph">{_esc(stripped)}</p>')
 
     for tbl in section.tables:
-        parts.append(_render_table(tbl))
+        _render_table(tbl, write)
 
     for lst in section.lists:
-        parts.append(_render_list(lst))
+        _render_list(lst, write)
 
     for cb in section.code_blocks:
-        parts.append(_render_code_block(cb))
+        _render_code_block(cb, write)
 
-    return f'<div class="section">{"".join(parts)}</div>'
+    write("</div>\n")
 
 
 # ---------------------------------------------------------------------------
@@ -351,6 +368,10 @@ def render_html(
         generated_date: Override the generation date (ISO string).
         table_color: One of the SAFE_TABLE_COLORS keys. Unknown values fall
                      back to DEFAULT_COLOR silently.
+
+    Fragments are written straight into one StringIO rather than collected
+    into intermediate lists and joined — large documents produce thousands
+    of fragments and the single buffer halves the transient allocations.
     """
     import datetime
     gen_date = generated_date or datetime.datetime.utcnow().strftime("%d %B %Y")
@@ -363,40 +384,11 @@ def render_html(
         table_stripe_bg=palette["stripe"],
     )
 
-    # ── Table of Contents ─────────────────────────────────────────────────────
-    named_sections = [s for s in model.sections if s.heading]
-    toc_rows = []
-    counter: dict[int, int] = {}
-    for s in named_sections:
-        lvl = s.level
-        counter[lvl] = counter.get(lvl, 0) + 1
-        for deeper in list(counter.keys()):
-            if deeper > lvl:
-                counter[deeper] = 0
-        num_str = ".".join(
-            str(counter.get(l, 0))
-            for l in sorted(k for k in counter if k <= lvl and counter.get(k, 0) > 0)
-        )
-        indent_class = f"indent-{lvl - 2}" if lvl > 2 else ""
-        toc_rows.append(
-            f'<li class="{indent_class}">'
-            f'<span class="toc-num">{_esc(num_str)}</span>'
-            f'{_esc(s.heading)}</li>'
-        )
-
-    toc_html = ""
-    if toc_rows:
-        toc_html = f"""
-        <nav class="toc no-break">
-          <div class="toc-title">Table of Contents</div>
-          <ol>{"".join(toc_rows)}</ol>
-        </nav>"""
-
-    # ── Body ─────────────────────────────────────────────────────────────────
-    body_html = "\n".join(_render_section(s) for s in model.sections)
+    buf = io.StringIO()
+    write = buf.write
 
-    # ── Assemble ─────────────────────────────────────────────────────────────
-    return f"""<!DOCTYPE html>
+    # ── Head + cover ──────────────────────────────────────────────────────────
+    write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8" />
@@ -412,13 +404,45 @@ def render_html(
     <div class="doc-generated">Generated: {_esc(gen_date)}</div>
   </header>
 
-  {toc_html}
+""")
 
-  {body_html}
+    # ── Table of Contents ─────────────────────────────────────────────────────
+    named_sections = [s for s in model.sections if s.heading]
+    if named_sections:
+        write('  <nav class="toc no-break">\n'
+              '    <div class="toc-title">Table of Contents</div>\n'
+              '    <ol>')
+        # Fixed-size level counters (headings are 1..6): bumping a level
+        # resets everything deeper, and the displayed number is a join over
+        # the non-zero prefix — no per-heading dict/sort allocations.
+        counter = [0] * 7
+        for s in named_sections:
+            lvl = s.level
+            counter[lvl] += 1
+            for deeper in range(lvl + 1, 7):
+                counter[deeper] = 0
+            num_str = ".".join(
+                str(counter[l]) for l in range(1, lvl + 1) if counter[l] > 0
+            )
+            indent_class = f"indent-{lvl - 2}" if lvl > 2 else ""
+            write(
+                f'<li class="{indent_class}">'
+                f'<span class="toc-num">{_esc(num_str)}</span>'
+                f'{_esc(s.heading)}</li>'
+            )
+        write("</ol>\n  </nav>\n\n")
 
+    # ── Body ─────────────────────────────────────────────────────────────────
+    for section in model.sections:
+        _render_section(section, write)
+
+    # ── Footer ───────────────────────────────────────────────────────────────
+    write(f"""
   <footer class="doc-footer">
     <span>{_esc(model.title)}</span>
     <span>Generated by CSRF &bull; {_esc(gen_date)}</span>
   </footer>
 </body>
-</html>"""
+</html>""")
+
+    return buf.getvalue()
@@ -12,11 +12,13 @@ from contextlib import asynccontextmanager
 
 import httpx
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 from routers import auth, convert, documents
-from database import init_db
+from database import init_db, close_db
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +32,7 @@ logger = logging.getLogger(__name__)
 
 PING_INTERVAL_SECONDS = 14 * 60   # 14 minutes
 
-async def _keep_alive_loop() -> None:
+async def _keep_alive_loop(client: httpx.AsyncClient) -> None:
     """Ping own health endpoint every 14 minutes to prevent Render cold-starts."""
     base_url = os.getenv("RENDER_EXTERNAL_URL", "").rstrip("/")
     if not base_url:
@@ -43,14 +45,13 @@ async def _keep_alive_loop() -> None:
     # Wait one full interval before the first ping so startup is not delayed
     await asyncio.sleep(PING_INTERVAL_SECONDS)
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        while True:
-            try:
-                resp = await client.get(health_url)
-                logger.info(f"Keep-alive ping → {resp.status_code}")
-            except Exception as exc:
-                logger.warning(f"Keep-alive ping failed: {exc}")
-            await asyncio.sleep(PING_INTERVAL_SECONDS)
+    while True:
+        try:
+            resp = await client.get(health_url)
+            logger.info(f"Keep-alive ping → {resp.status_code}")
+        except Exception as exc:
+            logger.warning(f"Keep-alive ping failed: {exc}")
+        await asyncio.sleep(PING_INTERVAL_SECONDS)
 
 
 # ── App lifespan ──────────────────────────────────────────────────────────────
@@ -60,8 +61,18 @@ async def lifespan(app: FastAPI):
     """Initialize DB and launch background keep-alive task on startup."""
     await init_db()
 
+    # One process-wide outbound HTTP client. keepalive_expiry outlasts the
+    # ping interval so each self-ping reuses a warm socket instead of paying
+    # TCP + TLS setup every 14 minutes; handlers that need to call out can
+    # share it via app.state.
+    http_client = httpx.AsyncClient(
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=900.0),
+    )
+    app.state.http_client = http_client
+
     # Start the keep-alive loop as a fire-and-forget background task
-    keep_alive_task = asyncio.create_task(_keep_alive_loop())
+    keep_alive_task = asyncio.create_task(_keep_alive_loop(http_client))
 
     yield
 
@@ -72,6 +83,9 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
 
+    await http_client.aclose()
+    await close_db()
+
 
 # ── FastAPI app ───────────────────────────────────────────────────────────────
 
@@ -80,25 +94,50 @@ app = FastAPI(
     description="Crimson Scriveners Readme Forger — Transform README files into professional reports.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # C-speed JSON for every endpoint
     # Security: hide API schema from browser dev tools
     openapi_url=None,
     docs_url=None,
     redoc_url=None,
 )
 
+# ── Body size guard ───────────────────────────────────────────────────────────
+# Reject oversized uploads from the declared Content-Length, before any body
+# bytes are read or buffered. The chunked read in the convert router remains
+# the backstop for clients that lie or stream without a length.
+_MAX_BODY_BYTES = convert.MAX_FILE_SIZE + 8192  # allowance for multipart framing
+
+
+@app.middleware("http")
+async def _reject_oversized_bodies(request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > _MAX_BODY_BYTES:
+        return ORJSONResponse({"detail": "File too large (max 5 MB)"}, status_code=413)
+    return await call_next(request)
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+# Preview responses carry the model JSON plus the full HTML string — hundreds
+# of KB of highly compressible text. Level 5 is the sweet spot between CPU
+# and ratio; tiny responses (health checks, errors) skip compression.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ── CORS ──────────────────────────────────────────────────────────────────────
 _frontend_url = os.getenv("FRONTEND_URL", "").strip().rstrip("/")
 
-_allowed_origins = [
+_allowed_origins = {
     "http://localhost:8080",
     "http://localhost:5173",
     "http://127.0.0.1:8080",
-]
+}
 if _frontend_url:
-    _allowed_origins.append(_frontend_url)
+    _allowed_origins.add(_frontend_url)
     # Also allow www. variant
     if _frontend_url.startswith("https://") and not _frontend_url.startswith("https://www."):
-        _allowed_origins.append(_frontend_url.replace("https://", "https://www.", 1))
+        _allowed_origins.add(_frontend_url.replace("https://", "https://www.", 1))
+
+# Frozen for O(1) origin membership checks — CORS runs on every request.
+_allowed_origins = frozenset(_allowed_origins)
 
 app.add_middleware(
     CORSMiddleware,
@@ -124,4 +163,20 @@ async def health_check():
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=False)
+    # uvicorn[standard] ships uvloop and httptools; request them explicitly
+    # rather than trusting auto-detection. Access logging is off — every
+    # request otherwise pays stderr formatting, and the keep-alive ping
+    # would spam a line every 14 minutes. Worker count stays at 1 unless
+    # WEB_CONCURRENCY says otherwise: each worker spawns its own document
+    # process pool, which adds up fast on a small instance.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        reload=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        timeout_keep_alive=75,
+    )
@@ -17,13 +17,14 @@ from __future__ import annotations
 
 import re
 import io
+import copy
+import hashlib
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any
 
-import mistletoe
 from mistletoe import Document as MistletoeDoc
-from mistletoe.ast_renderer import AstRenderer
 
 logger = logging.getLogger(__name__)
 
@@ -107,194 +108,259 @@ def _clean_inline(text: str) -> str:
     return text.strip()
 
 
-def _extract_text_from_ast_node(node: dict) -> str:
-    """Recursively extract plain text from an AST node."""
-    if not isinstance(node, dict):
-        return ""
-    t = node.get("type", "")
-    children = node.get("children", [])
-
-    if t == "RawText":
-        return node.get("content", "")
-    if t in ("Strong", "Emphasis", "Strikethrough"):
-        return "".join(_extract_text_from_ast_node(c) for c in children)
-    if t == "InlineCode":
-        return node.get("content", "")
-    if t == "Link":
-        return "".join(_extract_text_from_ast_node(c) for c in children)
-    if t == "Image":
-        return ""  # Remove images from text extraction
-    return "".join(_extract_text_from_ast_node(c) for c in children)
-
+def _extract_text_from_ast_node(node, model: "DocumentModel | None" = None) -> str:
+    """Extract plain text from a mistletoe token.
+
+    Iterative DFS: inline trees are wide and shallow, and a Python frame
+    plus a join per tiny leaf token cost more than the extraction itself.
+    One explicit stack and a single final join keep it flat.
+
+    When ``model`` is given, external links encountered along the way set
+    its has_references flag — piggybacking on a pass that visits every
+    inline token anyway instead of re-scanning the raw markdown for them.
+    """
+    out: list[str] = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        name = type(n).__name__
+        if name == "RawText":
+            out.append(n.content)
+        elif name == "Image":
+            continue  # Remove images from text extraction
+        else:
+            if (
+                name == "Link"
+                and model is not None
+                and not model.has_references
+                and str(getattr(n, "target", "")).startswith("http")
+            ):
+                model.has_references = True
+            # Strong/Emphasis/Strikethrough/Link/InlineCode all reduce to
+            # their children's text.
+            children = getattr(n, "children", None)
+            if children:
+                stack.extend(reversed(children))
+    return "".join(out)
+
+
+# Badge/shield detection runs per line in preprocessing and per paragraph in
+# the AST walk; one combined alternation scans each string once instead of
+# twice. Callers only truth-test the result, so the bound search method
+# serves directly as the predicate.
+_BADGE_COMBINED = re.compile(
+    f"(?:{BADGE_RE.pattern})|(?:{SHIELD_RE.pattern})", re.IGNORECASE
+)
 
-def _is_badge_line(line: str) -> bool:
-    """Detect shield/badge markdown lines."""
-    return bool(BADGE_RE.search(line) or SHIELD_RE.search(line))
+_is_badge_line = _BADGE_COMBINED.search
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # AST Walker → DocumentModel
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _parse_table_node(node: dict) -> TableNode:
-    """Convert an AST Table node to a TableNode."""
+def _parse_table_node(node, model: DocumentModel) -> TableNode:
+    """Convert a mistletoe Table token to a TableNode."""
     table = TableNode()
-    children = node.get("children", [])
-    for row_node in children:
-        if row_node.get("type") != "TableRow":
-            continue
-        cells = row_node.get("children", [])
-        row_texts = [_clean_inline(_extract_text_from_ast_node(c)) for c in cells]
-        if row_node.get("header"):
-            table.headers = row_texts
-        else:
-            table.rows.append(row_texts)
+    # mistletoe keeps the header row on token.header, not in children.
+    header = getattr(node, "header", None)
+    if header is not None:
+        table.headers = [_clean_inline(_extract_text_from_ast_node(c, model)) for c in header.children]
+    for row_node in node.children:
+        table.rows.append(
+            [_clean_inline(_extract_text_from_ast_node(c, model)) for c in row_node.children]
+        )
     # Auto-repair: if headers empty, promote first row
     if not table.headers and table.rows:
         table.headers = table.rows.pop(0)
     return table
 
 
-def _parse_list_node(node: dict) -> ListNode:
-    lst = ListNode(ordered=node.get("start") is not None)
-    for item in node.get("children", []):
+def _parse_list_node(node, model: DocumentModel) -> ListNode:
+    lst = ListNode(ordered=getattr(node, "start", None) is not None)
+    for item in node.children:
         text_parts = []
-        for child in item.get("children", []):
-            if child.get("type") == "Paragraph":
-                for sub in child.get("children", []):
-                    text_parts.append(_extract_text_from_ast_node(sub))
+        for child in item.children:
+            if type(child).__name__ == "Paragraph":
+                for sub in child.children:
+                    text_parts.append(_extract_text_from_ast_node(sub, model))
         text = _clean_inline(" ".join(text_parts))
         if text:
             lst.items.append(text)
     return lst
 
 
-def _walk_ast(nodes: list[dict], model: DocumentModel, current_section: list[Section]):
-    """Walk AST nodes and populate the document model."""
-    for node in nodes:
-        t = node.get("type", "")
-
-        if t == "Heading":
-            level = node.get("level", 1)
-            raw_text = "".join(_extract_text_from_ast_node(c) for c in node.get("children", []))
-            text = _clean_inline(raw_text)
-            if not text:
-                continue
-
-            if level == 1 and not model.title:
-                model.title = text
-                # Start a pseudo-section for title content
-                sec = Section(heading="", level=1)
-                model.sections.append(sec)
-                current_section.clear()
-                current_section.append(sec)
-            else:
-                sec = Section(heading=text, level=level)
-                model.sections.append(sec)
-                current_section.clear()
-                current_section.append(sec)
-
-        elif t == "Paragraph":
-            raw = "".join(_extract_text_from_ast_node(c) for c in node.get("children", []))
-            cleaned = _clean_inline(raw)
-            if not cleaned or _is_badge_line(cleaned):
-                continue
-            # Skip separator-like lines
-            if SEPARATOR_RE.match(cleaned):
-                continue
-            if current_section:
-                current_section[0].content.append(cleaned)
+class _Walker:
+    """Stateful AST walk: model plus a plain ``current`` section attribute.
+
+    The current section used to be threaded through every handler as a
+    one-element list mutated with clear()+append(); an attribute write is
+    both cheaper and honest about what it is.
+    """
+
+    __slots__ = ("model", "current")
+
+    def __init__(self, model: DocumentModel):
+        self.model = model
+        self.current: Section | None = None
+
+    def _open_section(self, sec: Section):
+        self.model.sections.append(sec)
+        self.current = sec
+
+    def _handle_heading(self, node):
+        level = node.level
+        raw_text = "".join(_extract_text_from_ast_node(c, self.model) for c in node.children)
+        text = _clean_inline(raw_text)
+        if not text:
+            return
+
+        if level == 1 and not self.model.title:
+            self.model.title = text
+            # Start a pseudo-section for title content
+            self._open_section(Section(heading="", level=1))
+        else:
+            self._open_section(Section(heading=text, level=level))
+
+    def _handle_paragraph(self, node):
+        raw = "".join(_extract_text_from_ast_node(c, self.model) for c in node.children)
+        cleaned = _clean_inline(raw)
+        if not cleaned or _is_badge_line(cleaned):
+            return
+        # Skip separator-like lines
+        if SEPARATOR_RE.match(cleaned):
+            return
+        if self.current is None:
+            # Create implicit intro section
+            self._open_section(Section(heading="", level=1))
+        self.current.content.append(cleaned)
+
+    def _handle_table(self, node):
+        tbl = _parse_table_node(node, self.model)
+        if self.current is not None and (tbl.headers or tbl.rows):
+            self.current.tables.append(tbl)
+
+    def _handle_list(self, node):
+        lst = _parse_list_node(node, self.model)
+        if self.current is not None and lst.items:
+            self.current.lists.append(lst)
+
+    def _handle_code_fence(self, node):
+        code = node.children[0].content if node.children else ""
+        lang = node.language or ""
+        if self.current is not None and code:
+            self.current.code_blocks.append(CodeBlock(code=code, language=lang))
+
+    def _handle_quote(self, node):
+        # Render blockquote content as tagged paragraph
+        for child in node.children:
+            if type(child).__name__ == "Paragraph":
+                raw = "".join(_extract_text_from_ast_node(c, self.model) for c in child.children)
+                cleaned = _clean_inline(raw)
+                if cleaned and self.current is not None:
+                    self.current.content.append("> " + cleaned)
+
+    def walk(self, nodes):
+        """Populate the model from mistletoe block tokens.
+
+        Iterative with an explicit deque: unhandled containers splice
+        their children back onto the front of the queue (preserving
+        document order) instead of recursing, so deep nesting costs
+        neither frames nor re-dispatch.
+        """
+        queue = deque(nodes)
+        while queue:
+            node = queue.popleft()
+            handler = _AST_HANDLERS.get(type(node).__name__)
+            if handler is not None:
+                handler(self, node)
             else:
-                # Create implicit intro section
-                sec = Section(heading="", level=1)
-                model.sections.append(sec)
-                current_section.append(sec)
-                sec.content.append(cleaned)
-
-        elif t == "Table":
-            tbl = _parse_table_node(node)
-            if current_section and (tbl.headers or tbl.rows):
-                current_section[0].tables.append(tbl)
-
-        elif t in ("List",):
-            lst = _parse_list_node(node)
-            if current_section and lst.items:
-                current_section[0].lists.append(lst)
-
-        elif t == "CodeFence":
-            code = node.get("children", [{}])[0].get("content", "") if node.get("children") else ""
-            lang = node.get("language", "")
-            if current_section and code:
-                current_section[0].code_blocks.append(CodeBlock(code=code, language=lang))
-
-        elif t == "BlockQuote":
-            # Render blockquote content as tagged paragraph
-            for child in node.get("children", []):
-                if child.get("type") == "Paragraph":
-                    raw = "".join(_extract_text_from_ast_node(c) for c in child.get("children", []))
-                    cleaned = _clean_inline(raw)
-                    if cleaned and current_section:
-                        current_section[0].content.append("> " + cleaned)
-
-        elif t == "ThematicBreak":
-            pass  # discard
-
-        # Recurse into block-level containers
-        elif "children" in node:
-            _walk_ast(node["children"], model, current_section)
+                children = getattr(node, "children", None)
+                if children:
+                    queue.extendleft(reversed(children))
+
+
+# O(1) dispatch per block token. ThematicBreak is absent on purpose: it has
+# no handler and no useful children, so the walker discards it.
+_AST_HANDLERS = {
+    "Heading": _Walker._handle_heading,
+    "Paragraph": _Walker._handle_paragraph,
+    "Table": _Walker._handle_table,
+    "List": _Walker._handle_list,
+    "CodeFence": _Walker._handle_code_fence,
+    "Quote": _Walker._handle_quote,
+}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Pre-processing raw markdown
 # ─────────────────────────────────────────────────────────────────────────────
 
+# All the per-line cleanups fused into one alternation so the raw text is
+# scanned once at C level instead of once per rule per line: drop badge and
+# separator lines outright, trim trailing hashes from inline headings (the
+# only branch that keeps anything, via the named group), and strip emoji
+# clusters. [ \t] stands in for \s so a match never swallows newlines.
+_PREPROCESS_RE = re.compile(
+    r"^[^\n]*(?:" + BADGE_RE.pattern + r"|" + SHIELD_RE.pattern + r")[^\n]*\n?"
+    r"|^[-*_]{3,}[ \t]*$\n?"
+    r"|(?P<inlineh>^#{1,6}[ \t]+.+?)[ \t]+#+[ \t]*$"
+    r"|" + EXCESS_EMOJI_RE.pattern,
+    re.IGNORECASE | re.MULTILINE | re.UNICODE,
+)
+
+
+def _preprocess_repl(m: re.Match) -> str:
+    return m.group("inlineh") if m.lastgroup == "inlineh" else ""
+
+
 def _preprocess_markdown(raw: str) -> str:
-    """Clean raw markdown before AST parsing."""
-    lines = []
-    for line in raw.splitlines():
-        # Remove badge lines
-        if _is_badge_line(line):
-            continue
-        # Remove separator lines
-        if SEPARATOR_RE.match(line):
-            continue
-        # Fix inline headings: "## Heading ##" → "## Heading"
-        line = re.sub(r"(#{1,6}\s+.+?)\s+#+\s*$", r"\1", line)
-        lines.append(line)
-
-    text = "\n".join(lines)
-    # Remove excess emoji clusters
-    text = EXCESS_EMOJI_RE.sub("", text)
-    return text
+    """Clean raw markdown before AST parsing — one pass, one compiled regex."""
+    return _PREPROCESS_RE.sub(_preprocess_repl, raw)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Public: parse → DocumentModel
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Parsed-model cache: content digest → DocumentModel. Users routinely convert
+# the same README several times in a row (preview, then PDF, then DOCX), and
+# each conversion re-ran the full mistletoe parse + AST walk. Keying by a
+# blake2b digest rather than the raw text keeps multi-MB uploads out of the
+# cache keys; entries are deep-copied on the way in and out so callers can
+# never mutate a cached model. Cleared wholesale at the cap, like the token
+# cache in auth_utils.
+PARSE_CACHE_MAX = 128
+_parse_cache: dict[tuple[bytes, str], DocumentModel] = {}
+
+
 def parse_markdown(raw: str, filename: str = "document") -> DocumentModel:
     """Parse raw markdown string into a DocumentModel."""
+    cache_key = (hashlib.blake2b(raw.encode(), digest_size=16).digest(), filename)
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     cleaned_raw = _preprocess_markdown(raw)
 
-    with AstRenderer() as renderer:
-        import json as _json
-        ast_json = renderer.render(MistletoeDoc(cleaned_raw))
-        ast = _json.loads(ast_json)
+    # Walk the mistletoe tokens directly — the previous AstRenderer pass
+    # serialized the whole AST to a JSON string only to json.loads it
+    # straight back into dicts, doubling allocations for every parse.
+    doc = MistletoeDoc(cleaned_raw)
 
     model = DocumentModel(title="")
-    current_section: list[Section] = []
-    _walk_ast(ast.get("children", []), model, current_section)
+    _Walker(model).walk(doc.children)
 
     # Fallback title from filename
     if not model.title:
         model.title = filename.replace(".md", "").replace("-", " ").replace("_", " ").title()
 
-    # Check for links → references section
-    model.has_references = bool(re.search(r"\[.*?\]\(https?://", raw))
-
     # Remove completely empty sections
     model.sections = [s for s in model.sections if s.heading or s.content or s.tables or s.lists or s.code_blocks]
 
+    if len(_parse_cache) >= PARSE_CACHE_MAX:
+        _parse_cache.clear()
+    _parse_cache[cache_key] = copy.deepcopy(model)
     return model
 
 
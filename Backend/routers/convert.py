@@ -8,20 +8,24 @@ POST /api/convert/
 
 from __future__ import annotations
 import os
-import io
 import uuid
+import codecs
+import datetime
+import hashlib
 import tempfile
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Request
+from fastapi.responses import Response, ORJSONResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 import database as db
 from auth_utils import get_current_user
 from md_parser import parse_markdown, model_to_dict
 from html_renderer import render_html, SAFE_TABLE_COLORS, DEFAULT_COLOR
-from document_generator import generate_docx, generate_pdf
+from document_generator import generate_docx_async, generate_pdf_async
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -31,22 +35,108 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
 OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs")
 os.makedirs(OUTPUTS_DIR, exist_ok=True)
 
+# On ephemeral filesystems (Render) archived files vanish on redeploy, so
+# the disk copy can be switched off entirely; the history record survives
+# either way.
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "1").lower() not in ("0", "false")
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 async def _read_and_validate(file: UploadFile) -> str:
+    """Stream the upload through an incremental decoder.
+
+    Reading in chunks rejects oversized files as soon as the limit is
+    crossed (not after buffering all of them) and never holds the encoded
+    and decoded copies in memory at once.
+    """
     if not file.filename or not file.filename.endswith(".md"):
         raise HTTPException(400, "Only .md files are accepted")
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(413, "File too large (max 5 MB)")
-    return content.decode("utf-8", errors="replace")
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = []
+    size = 0
+    while chunk := await file.read(65536):
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            raise HTTPException(413, "File too large (max 5 MB)")
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    # Raw fd write: the blob is already one contiguous bytes object, so
+    # going through Python's buffered-IO layer just adds an extra copy.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+async def _persist_download(
+    data: bytes,
+    out_filename: str,
+    user_id: str,
+    filename: str,
+    output_type: str,
+    model_dict: dict,
+) -> None:
+    """Archive a generated document and record it (post-response)."""
+    try:
+        file_path = ""
+        if ARCHIVE_ENABLED:
+            file_path = os.path.join(OUTPUTS_DIR, f"{uuid.uuid4()}_{out_filename}")
+            await run_in_threadpool(_write_bytes, file_path, data)
+        await db.save_document_sqlite(
+            user_id=user_id,
+            original_filename=filename,
+            output_type=output_type,
+            cleaned_structure=model_dict,
+            file_path=file_path,
+        )
+    except Exception as e:
+        logger.warning(f"DB/file save failed: {e}")
+
+
+# Rendered-HTML cache: (content digest, filename, colour, date) → HTML
+# string. The preview-then-download flow re-renders the identical document
+# seconds apart; parse_markdown already caches the model, this covers the
+# render. Filename is part of the key because title-less documents fall back
+# to it for the page title, and the date because the page embeds it.
+RENDER_CACHE_MAX = 64
+_render_cache: dict[tuple[bytes, str, str, str], str] = {}
+
+
+def _parse_and_render(raw: str, filename: str, safe_color: str):
+    """Parse + render in one unit of CPU-bound work.
+
+    Runs inside Starlette's threadpool so a multi-MB parse doesn't stall
+    the event loop; bundling the three steps costs one hop instead of
+    three.
+    """
+    model = parse_markdown(raw, filename)
+    gen_date = datetime.datetime.utcnow().strftime("%d %B %Y")
+    key = (
+        hashlib.blake2b(raw.encode(), digest_size=16).digest(),
+        filename,
+        safe_color,
+        gen_date,
+    )
+    html = _render_cache.get(key)
+    if html is None:
+        html = render_html(model, generated_date=gen_date, table_color=safe_color)
+        if len(_render_cache) >= RENDER_CACHE_MAX:
+            _render_cache.clear()
+        _render_cache[key] = html
+    return model, model_to_dict(model), html
 
 
 # ── Endpoints ────────────────────────────────────────────────────────────────
 
 @router.post("/preview")
 async def convert_preview(
+    request: Request,
     file: UploadFile = File(...),
     table_color: str = Form(DEFAULT_COLOR),
     current_user: Optional[dict] = Depends(get_current_user),
@@ -59,12 +149,24 @@ async def convert_preview(
     raw = await _read_and_validate(file)
     filename = file.filename or "document.md"
 
+    # Validate colour against allowlist
+    safe_color = table_color if table_color in SAFE_TABLE_COLORS else DEFAULT_COLOR
+
+    # Strong ETag over content + filename + colour: re-uploading an unchanged
+    # file (frontend option toggling) short-circuits before any parsing, and
+    # the client can drop the multi-KB body entirely. Filename matters — the
+    # response echoes it and title-less documents derive their title from it.
+    etag = '"%s"' % hashlib.blake2b(
+        b"\x00".join((raw.encode(), filename.encode(), safe_color.encode())),
+        digest_size=16,
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     try:
-        model = parse_markdown(raw, filename)
-        model_dict = model_to_dict(model)
-        # Validate colour against allowlist
-        safe_color = table_color if table_color in SAFE_TABLE_COLORS else DEFAULT_COLOR
-        html = render_html(model, table_color=safe_color)
+        model, model_dict, html = await run_in_threadpool(
+            _parse_and_render, raw, filename, safe_color
+        )
     except Exception as exc:
         logger.exception("Parsing failed")
         raise HTTPException(500, f"Conversion failed: {exc}")
@@ -84,13 +186,16 @@ async def convert_preview(
         except Exception as e:
             logger.warning(f"DB save failed: {e}")
 
-    return JSONResponse({
+    # orjson serializes the (potentially large) model dict + HTML string in
+    # C; the stdlib json encoder was the biggest per-preview allocation
+    # after the parse itself.
+    return ORJSONResponse({
         "success": True,
         "doc_id": doc_id,
         "filename": filename,
         "document_model": model_dict,
         "html_preview": html,
-    })
+    }, headers={"ETag": etag})
 
 
 @router.post("/download")
@@ -110,11 +215,11 @@ async def convert_and_download(
     filename = file.filename or "document.md"
     stem = filename.replace(".md", "").replace(" ", "_")
 
+    safe_color = table_color if table_color in SAFE_TABLE_COLORS else DEFAULT_COLOR
     try:
-        model = parse_markdown(raw, filename)
-        model_dict = model_to_dict(model)
-        safe_color = table_color if table_color in SAFE_TABLE_COLORS else DEFAULT_COLOR
-        html = render_html(model, table_color=safe_color)
+        model, model_dict, html = await run_in_threadpool(
+            _parse_and_render, raw, filename, safe_color
+        )
     except Exception as exc:
         logger.exception("Parsing failed")
         raise HTTPException(500, f"Conversion failed: {exc}")
@@ -125,7 +230,7 @@ async def convert_and_download(
         out_filename = f"{stem}_report.html"
     elif format == "docx":
         try:
-            data = generate_docx(model, table_color=safe_color)
+            data = await generate_docx_async(model, table_color=safe_color)
         except Exception as exc:
             logger.exception("DOCX generation failed")
             raise HTTPException(500, f"DOCX generation failed: {exc}")
@@ -133,31 +238,34 @@ async def convert_and_download(
         out_filename = f"{stem}_report.docx"
     else:  # pdf
         try:
-            data = generate_pdf(html, table_color=safe_color)
+            data = await generate_pdf_async(html, table_color=safe_color, model=model)
         except Exception as exc:
             logger.exception("PDF generation failed")
             raise HTTPException(500, f"PDF generation failed: {exc}")
         media_type = "application/pdf"
         out_filename = f"{stem}_report.pdf"
 
-    # Save locally and record in DB if authenticated
+    # Archive + history record happen after the response is sent — the
+    # client's download shouldn't wait on our disk write and DB insert.
+    background = None
     if current_user:
-        try:
-            file_path = os.path.join(OUTPUTS_DIR, f"{uuid.uuid4()}_{out_filename}")
-            with open(file_path, "wb") as f:
-                f.write(data)
-            await db.save_document_sqlite(
-                user_id=current_user["sub"],
-                original_filename=filename,
-                output_type=format,
-                cleaned_structure=model_dict,
-                file_path=file_path,
-            )
-        except Exception as e:
-            logger.warning(f"DB/file save failed: {e}")
+        background = BackgroundTask(
+            _persist_download,
+            data,
+            out_filename,
+            current_user["sub"],
+            filename,
+            format,
+            model_dict,
+        )
 
     headers = {
         "Content-Disposition": f'attachment; filename="{out_filename}"; filename*=UTF-8\'\'{out_filename}',
-        "Content-Length": str(len(data)),
     }
-    return StreamingResponse(io.BytesIO(data), media_type=media_type, headers=headers)
+    if format != "html":
+        # DOCX and PDF are already deflate-compressed containers; declaring
+        # the encoding makes GZipMiddleware leave the body alone instead of
+        # burning CPU recompressing it for ~0% savings. HTML downloads stay
+        # eligible — they compress like the preview does.
+        headers["Content-Encoding"] = "identity"
+    return Response(content=data, media_type=media_type, headers=headers, background=background)